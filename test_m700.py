@@ -28,7 +28,7 @@ class TestM700(unittest.TestCase):
 
     def setUp(self):
         '''テストごとに開始前に必ず実行'''
-        if not self.m700.is_open():
+        if not self.m700.ensure_open():
             self.skipTest('指定されたIPに接続できません。電源が入っていない可能性があります。')
 
     def test_result_type(self):
@@ -42,9 +42,11 @@ class TestM700(unittest.TestCase):
         self.assertIs(type(self.m700.get_run_status()), M700.RunStatus)
         self.assertIs(type(self.m700.get_rpm()), int)
         self.assertIs(type(self.m700.get_load()), int)
+        self.assertIs(type(self.m700.get_spindle_snapshot()), dict)
         self.assertIs(type(self.m700.get_mgn_size()), int)
         self.assertIs(type(self.m700.get_mgn_ready()), int)
         self.assertIs(type(self.m700.get_toolset_size()), int)
+        self.assertIs(type(self.m700.get_all_tool_offsets()), dict)
         self.assertIs(type(self.m700.get_program_number(M700.ProgramType.MAIN)), str)
         self.assertIs(type(self.m700.get_alarm()), str)
 
@@ -53,8 +55,22 @@ class TestM700(unittest.TestCase):
         drivenm = self.m700.get_drive_infomation()
         self.m700.write_file(drivenm + '¥PRG¥USER¥__TEST__.txt', b'TEST_WRITE')
         self.assertEqual(self.m700.read_file(drivenm + '¥PRG¥USER¥__TEST__.txt'), b'TEST_WRITE')
+        entries = [e for e in self.m700.find_dir(drivenm + '¥PRG¥USER¥') if e['name'] == '__TEST__.txt']
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0]['type'], 'file')
+        self.assertRegex(entries[0]['size'], r'^\d{1,3}(,\d{3})*$')  # 3桁区切りでフォーマットされたサイズ
         self.m700.delete_file(drivenm + '¥PRG¥USER¥__TEST__.txt')
 
+    def test_operate_program_file_chunks(self):
+        '''空／FILE_CHUNK_SIZE をまたぐ／ちょうど倍数のサイズの加工プログラム読み書きテスト。'''
+        drivenm = self.m700.get_drive_infomation()
+        path = drivenm + '¥PRG¥USER¥__TEST__.txt'
+        for size in (0, 2500, 2 * M700.FILE_CHUNK_SIZE):
+            data = bytes(b'0123456789ABCDEF'[i % 16] for i in range(size))
+            self.m700.write_file(path, data)
+            self.assertEqual(self.m700.read_file(path), data)
+        self.m700.delete_file(path)
+
     def test_dev_operation(self):
         '''M,Dデバイスの読み書きテスト。'''
         self.m700.write_dev('M900', 1)
@@ -65,6 +81,10 @@ class TestM700(unittest.TestCase):
         self.assertEqual(self.m700.read_dev('D200'), 10)
         self.m700.write_dev('D200', 0)
         self.assertEqual(self.m700.read_dev('D200'), 0)
+        self.m700.write_devs(['M900', 'D200'], [1, 10])
+        self.assertEqual(self.m700.read_devs(['M900', 'D200']), [1, 10])
+        self.m700.write_devs(['M900', 'D200'], [0, 0])
+        self.assertEqual(self.m700.read_devs(['M900', 'D200']), [0, 0])
             
 if __name__ == '__main__':
     unittest.main()